@@ -1,22 +1,37 @@
 
 import base64
+import hashlib
+import html
+import json
+import os
+import re
 from pathlib import Path
+from typing import BinaryIO
+from urllib.parse import quote
 
+import numpy as np
 import pandas as pd
+import plotly
 import plotly.graph_objects as go
 import plotly.io as pio
+from plotly.offline import get_plotlyjs, get_plotlyjs_version
 
 # =========================
 # (A) BASIC CONFIG
 # =========================
 CSV_PATH = Path("Events.csv")          # CSV file (Year, Event, Text, Description)
 OUTPUT_HTML = Path("index.html")       # Output single-file HTML (shareable)
+MINIFY_HTML = True                     # Strip comments/indentation from the page templates
 BG_COLOR = "#D6413D"                   # Full-screen background color
+CACHE_DIR = Path(".cache")             # Cached plot HTML (reused while CSV/config are unchanged)
+PLOTLY_JS_MODE = "cdn"                 # "cdn" (load from cdn.plot.ly) or "directory" (shared local
+                                       # plotly.min.js next to OUTPUT_HTML, cached by the browser)
 
 # =========================
 # (B) ICON CONFIG
 # =========================
-# Prefer SVG for crisp scaling. If you use PNG:
+# Prefer SVG for crisp scaling (embedded as compact percent-encoded text).
+# If you use PNG (embedded as base64):
 #   ICON_PATH = Path("icon.png")
 #   ICON_MIME = "image/png"
 ICON_PATH = Path("icon.svg")
@@ -31,21 +46,90 @@ TICK_COLOR = "rgba(245,245,245,0.72)"       # Year labels + tick marks (light)
 LINE_WIDTH = 8                               # Line thickness
 SELECTED_SIZE = 22                           # Selected node size
 UNSELECTED_SIZE = 15                         # Unselected node size
+WEBGL_MIN_POINTS = 50                        # From this many events on, render with WebGL (scattergl)
+MARKER_TABLE_MAX_POINTS = 50                 # Below this many events, precompute N x N marker tables for JS
 
 
 # =========================
 # (D) HELPERS
 # =========================
-def file_to_data_uri(path: Path, mime: str) -> str:
+B64_CHUNK = 48 * 1024   # read size for streamed base64 (multiple of 3 => no padding mid-stream)
+
+
+def write_data_uri(out: BinaryIO, path: Path, mime: str) -> None:
+    """
+    Write a local file as a data URI straight into `out` so the final HTML is
+    fully portable (no external image dependencies).
+
+    Text formats (SVG) are percent-encoded, which is smaller than base64;
+    binary formats (PNG/JPEG) are base64-encoded chunk by chunk, so the whole
+    payload is never held in memory as one big string.
+    """
+    if mime.startswith("image/svg") or mime.startswith("text/"):
+        text = path.read_text(encoding="utf-8")
+        text = re.sub(r"<!--.*?-->", "", text, flags=re.S)   # drop XML comments
+        text = re.sub(r"\s+", " ", text).strip()              # collapse whitespace
+        out.write(f"data:{mime};utf8,{quote(text, safe=' ')}".encode("ascii"))
+        return
+    out.write(f"data:{mime};base64,".encode("ascii"))
+    with path.open("rb") as f:
+        while chunk := f.read(B64_CHUNK):
+            out.write(base64.b64encode(chunk))   # already ASCII bytes, no decode/encode
+
+
+def marker_style(i: int, n: int) -> tuple[list[str], list[int]]:
+    """
+    Node colors/sizes when node `i` is selected:
+    nodes up to i are active (past), node i is enlarged, the rest are inactive.
+    """
+    colors = [ACTIVE_COLOR] * (i + 1) + [INACTIVE_COLOR] * (n - i - 1)
+    sizes = [UNSELECTED_SIZE] * n
+    sizes[i] = SELECTED_SIZE
+    return colors, sizes
+
+
+def minify_markup(text: str) -> str:
     """
-    Convert a local file into a base64 data URI so the final HTML is fully portable
-    (no external image dependencies).
+    Cheap minifier for the page's own HTML/CSS/JS templates (never for CSV text):
+    drops /* */ comments, full-line // comments, indentation and blank lines.
+    Line breaks are kept, so JS automatic semicolon insertion is unaffected.
     """
-    if not path.exists():
-        return ""
-    data = path.read_bytes()
-    b64 = base64.b64encode(data).decode("utf-8")
-    return f"data:{mime};base64,{b64}"
+    if not MINIFY_HTML:
+        return text
+    text = re.sub(r"/\*.*?\*/", "", text, flags=re.S)
+    lines = (line.strip() for line in text.splitlines())
+    return "\n".join(line for line in lines if line and not line.startswith("//")) + "\n"
+
+
+def ensure_plotly_bundle(path: Path) -> None:
+    """
+    Write plotly.min.js (for PLOTLY_JS_MODE == "directory") unless the existing file
+    is already this plotly version. The bundle starts with a "plotly.js vX.Y.Z"
+    banner, so a plotly upgrade (new div JSON) also refreshes the bundle.
+    """
+    banner = f"plotly.js v{get_plotlyjs_version()}".encode("ascii")
+    if path.exists():
+        with path.open("rb") as f:
+            if banner in f.read(256):
+                return
+    path.write_text(get_plotlyjs(), encoding="utf-8")
+
+
+def plot_cache_key() -> str:
+    """
+    Hash everything the plot div depends on: the CSV, the config read by
+    build_figure / pio.to_html, this script and the plotly version.
+    Any change produces a new key (=> rebuild).
+    """
+    inputs = (
+        ACTIVE_COLOR, INACTIVE_COLOR, TICK_COLOR, LINE_WIDTH,
+        SELECTED_SIZE, UNSELECTED_SIZE, WEBGL_MIN_POINTS,
+        PLOTLY_JS_MODE, plotly.__version__,
+    )
+    h = hashlib.blake2b(CSV_PATH.read_bytes(), digest_size=16)
+    h.update(repr(inputs).encode("utf-8"))
+    h.update(Path(__file__).read_bytes())
+    return h.hexdigest()
 
 
 # =========================
@@ -56,29 +140,37 @@ def build_figure(df: pd.DataFrame):
     Create a Plotly timeline:
       - Two line traces: past (active) + future (inactive)
       - One marker trace: all nodes (years)
-      - Custom year labels + vertical tick marks (to avoid overlap)
+      - One line trace with all vertical tick marks
+      - One text trace with the year labels (alternating up/down to avoid overlap)
       - Tooltip is DISABLED but clicking nodes still works
+      - WebGL (scattergl) traces once there are WEBGL_MIN_POINTS+ events
+    Expects `df` already sorted by (Year, Event).
     """
-    df = df.sort_values(["Year", "Event"]).reset_index(drop=True)
+    # NumPy arrays let plotly embed x/y as compact base64 typed arrays
+    years = df["Year"].to_numpy(dtype=np.int32)
+    zeros = np.zeros(len(years), dtype=np.float32)
+    seg_y = np.zeros(2, dtype=np.float32)   # y for the 2-point line segments
 
-    years = df["Year"].tolist()
-    y0 = 0
-
-    customdata = list(zip(df["Year"], df["Text"], df["Description"]))
+    # Long timelines: WebGL draws all markers in one call instead of N SVG nodes
+    ScatterCls = go.Scattergl if len(years) >= WEBGL_MIN_POINTS else go.Scatter
 
+    # The line is straight, so each part only needs its two endpoints:
+    # past = first..selected, future = selected..last (JS moves the shared point).
+    # Everything stays in NumPy (no .tolist() round-trip) for the typed-array path.
     selected_idx = 0
-    past_x = years[: selected_idx + 1]
-    future_x = years[selected_idx:]
+    past_x = years.take([0, selected_idx])
+    future_x = years.take([selected_idx, -1])
 
-    colors = [ACTIVE_COLOR] + [INACTIVE_COLOR] * (len(years) - 1)
-    sizes = [SELECTED_SIZE] + [UNSELECTED_SIZE] * (len(years) - 1)
+    # Initial state == what highlight(selected_idx) does in JS, so no restyle on load
+    colors, sizes = marker_style(selected_idx, len(years))
+    sizes = np.asarray(sizes, dtype=np.int32)
 
     fig = go.Figure()
 
     fig.add_trace(
-        go.Scatter(
+        ScatterCls(
             x=past_x,
-            y=[y0] * len(past_x),
+            y=seg_y,
             mode="lines",
             line=dict(width=LINE_WIDTH, color=ACTIVE_COLOR),
             hoverinfo="skip",
@@ -88,9 +180,9 @@ def build_figure(df: pd.DataFrame):
     )
 
     fig.add_trace(
-        go.Scatter(
+        ScatterCls(
             x=future_x,
-            y=[y0] * len(future_x),
+            y=seg_y,
             mode="lines",
             line=dict(width=LINE_WIDTH, color=INACTIVE_COLOR),
             hoverinfo="skip",
@@ -100,9 +192,9 @@ def build_figure(df: pd.DataFrame):
     )
 
     fig.add_trace(
-        go.Scatter(
+        ScatterCls(
             x=years,
-            y=[y0] * len(years),
+            y=zeros,
             mode="markers",
             marker=dict(
                 size=sizes,
@@ -110,13 +202,12 @@ def build_figure(df: pd.DataFrame):
                 opacity=1.0,
                 line=dict(width=0)
             ),
-            customdata=customdata,
 
             # =========================
             # TOOLTIP (DISABLED) ✅
             # =========================
             hoverinfo="none",          # ✅ no tooltip, but points remain clickable
-            # hovertemplate="<b>%{customdata[1]}</b><br>Year: %{customdata[0]}<extra></extra>",
+            # hovertemplate="Year: %{x}<extra></extra>",
 
             showlegend=False,
             name="points",
@@ -148,68 +239,216 @@ def build_figure(df: pd.DataFrame):
     fig.update_xaxes(showgrid=False, showticklabels=False, zeroline=False)
     fig.update_yaxes(visible=False, range=[-0.42, 0.30], fixedrange=True)
 
-    shapes = []
-    annotations = []
-    for i, year in enumerate(years):
-        shapes.append(
-            dict(
-                type="line",
-                xref="x",
-                yref="y",
-                x0=year,
-                x1=year,
-                y0=-0.03,
-                y1=-0.16,
-                line=dict(color=TICK_COLOR, width=2),
-            )
+    # Tick marks: ONE line trace of N segments (year,-0.03)->(year,-0.16), separated
+    # by NaN gaps, instead of N layout shapes (one SVG path instead of N elements).
+    # Added last so the ticks stay on top of the markers, like layout shapes did.
+    tick_x = np.repeat(years.astype(np.float32), 3)
+    tick_x[2::3] = np.nan
+    tick_y = np.tile(np.array([-0.03, -0.16, np.nan], dtype=np.float32), len(years))
+    fig.add_trace(
+        ScatterCls(
+            x=tick_x,
+            y=tick_y,
+            mode="lines",
+            line=dict(width=2, color=TICK_COLOR),
+            connectgaps=False,
+            hoverinfo="skip",
+            showlegend=False,
+            name="ticks",
         )
+    )
 
-        y_label = -0.24 if i % 2 == 0 else -0.34
-        annotations.append(
-            dict(
-                x=year,
-                y=y_label,
-                xref="x",
-                yref="y",
-                text=str(year),
-                showarrow=False,
-                font=dict(size=18, color=TICK_COLOR),
-                align="center",
-            )
-        )
+    # Alternating (up/down) year labels: ONE text trace instead of N layout annotations
+    y_labels = np.where(np.arange(len(years)) % 2 == 0, -0.24, -0.34).astype(np.float32)
+
+    labels = ScatterCls(
+        x=years,
+        y=y_labels,
+        mode="text",
+        text=[str(year) for year in years.tolist()],
+        textfont=dict(size=18, color=TICK_COLOR),
+        hoverinfo="skip",
+        showlegend=False,
+        name="year_labels",
+    )
+    if ScatterCls is go.Scatter:
+        labels.cliponaxis = False   # edge labels may overhang the plot area (like annotations)
+    fig.add_trace(labels)
 
-    fig.update_layout(shapes=shapes, annotations=annotations)
-    return fig, df
+    return fig
 
 
 # =========================
 # (F) BUILD FULL RESPONSIVE HTML (LAYOUT + JS INTERACTION)
 # =========================
-def build_html(fig: go.Figure, df: pd.DataFrame, icon_uri: str) -> str:
+# Page interaction script. Plain (non f-) string: every Python value it needs
+# comes in through the EVENTS / CFG JSON block written just before it.
+TIMELINE_JS = """<script>
+whenPlotly(function() {
+  const gd = document.getElementById("timeline");
+  const PAST = 0, FUTURE = 1, POINTS = 2;
+  // x is embedded as a typed-array spec, so keep a plain copy for lookups
+  const XS = EVENTS.map((e) => e.Year);
+
+  let selectedIndex = 0;
+
+  function clamp(i) {
+    const n = XS.length;
+    return Math.max(0, Math.min(n - 1, i));
+  }
+
+  function updateDetails(i) {
+    const ev = EVENTS[i];
+    document.getElementById("metaYear").textContent = "Year: " + ev.Year;
+    document.getElementById("detailTitle").textContent = ev.Text;
+    document.getElementById("detailDesc").innerHTML = ev.desc_html;
+  }
+
+  // Same result as marker_style(i, n) in Python
+  function markerStyle(i) {
+    if (CFG.COLORS_BY_I) return [CFG.COLORS_BY_I[i], CFG.SIZES_BY_I[i]];
+    const n = XS.length;
+    const colors = Array(n).fill(CFG.INACTIVE_COLOR).fill(CFG.ACTIVE_COLOR, 0, i + 1);
+    const sizes = Array(n).fill(CFG.UNSELECTED_SIZE);
+    sizes[i] = CFG.SELECTED_SIZE;
+    return [colors, sizes];
+  }
+
+  function highlight(i) {
+    const [colors, sizes] = markerStyle(i);
+
+    // One restyle for lines + markers (one redraw per click).
+    // Values are per trace in [PAST, FUTURE, POINTS] order; undefined = leave as-is.
+    // Lines are 2-point segments, so moving the split point is O(1) (no slicing).
+    Plotly.restyle(gd, {
+      x: [[XS[0], XS[i]], [XS[i], XS[XS.length - 1]], undefined],
+      "marker.color": [undefined, undefined, colors],
+      "marker.size":  [undefined, undefined, sizes]
+    }, [PAST, FUTURE, POINTS]);
+
+    updateDetails(i);
+    selectedIndex = i;
+  }
+
+  gd.on("plotly_click", (e) => {
+    if (!e || !e.points || !e.points.length) return;
+    const pt = e.points[0];
+    if (pt.curveNumber !== POINTS) return;
+    highlight(pt.pointIndex);
+  });
+
+  document.getElementById("prevBtn").addEventListener("click", () => {
+    highlight(clamp(selectedIndex - 1));
+  });
+  document.getElementById("nextBtn").addEventListener("click", () => {
+    highlight(clamp(selectedIndex + 1));
+  });
+});
+</script>
+"""
+
+# plotly.js is loaded with `async` (see defer_plotly) so the title and first event
+# paint before the ~3MB library arrives. Code that needs Plotly goes through
+# whenPlotly(): run now if loaded, else queue (FIFO) until the script's onload.
+PLOTLY_LOADER_JS = """<script>
+const plotlyQueue = [];
+function whenPlotly(fn) { if (window.Plotly) fn(); else plotlyQueue.push(fn); }
+function plotlyLoaded() { while (plotlyQueue.length) plotlyQueue.shift()(); }
+</script>
+"""
+
+
+def defer_plotly(plot_div: bytes) -> bytes:
+    """
+    Make the plotly <script src> async and wrap plotly's inline Plotly.newPlot(...)
+    call in whenPlotly(), so it runs once the library has loaded.
+    """
+    plot_div = re.sub(rb"<script ([^>]*\bsrc=)", rb'<script async onload="plotlyLoaded()" \1', plot_div, count=1)
+    return re.sub(
+        rb"(<script[^>]*>)(\s*window\.PLOTLYENV.*?)(</script>)",
+        rb"\1whenPlotly(function() {\2});\3",
+        plot_div,
+        count=1,
+        flags=re.S,
+    )
+
+
+def build_plot_div(df: pd.DataFrame) -> bytes:
+    """
+    Return the plotly <div> + script for the timeline as UTF-8 bytes.
+    pio.to_html is the slow step, so its output is cached on disk under CACHE_DIR.
+    """
+    cache_path = CACHE_DIR / f"{plot_cache_key()}.html"
+    if cache_path.exists():
+        return cache_path.read_bytes()
+
     plot_div = pio.to_html(
-        fig,
-        include_plotlyjs="cdn",
+        build_figure(df),
+        include_plotlyjs=PLOTLY_JS_MODE,
         full_html=False,
         config={"responsive": True, "displayModeBar": False},
         div_id="timeline",
-    )
+        validate=False,   # figure is built from validated go objects already
+    ).encode("utf-8")
+
+    # Write-then-rename: an interrupted run never leaves a truncated <key>.html behind
+    CACHE_DIR.mkdir(exist_ok=True)
+    tmp_path = cache_path.with_suffix(f".{os.getpid()}.tmp")
+    tmp_path.write_bytes(plot_div)
+    os.replace(tmp_path, cache_path)
 
-    first = df.iloc[0]
-    first_year = str(first["Year"])
-    first_title = str(first["Text"])
-    first_desc = str(first["Description"])
+    # Only the current entry is ever read again: drop stale ones
+    for old in CACHE_DIR.iterdir():
+        if old != cache_path and old.suffix in (".html", ".tmp"):
+            old.unlink(missing_ok=True)
+    return plot_div
 
-    icon_html = ""
-    if icon_uri:
-        icon_html = f'<img class="title-icon" src="{icon_uri}" alt="icon" />'
 
-    return f"""
+def build_html(out: BinaryIO, plot_div: bytes, df: pd.DataFrame) -> None:
+    """
+    Write the page into a binary handle. Large parts (icon, plot div) are
+    written as ready-made bytes; only the small templated parts get encoded.
+    """
+    # Event content lives in one JS array instead of the points trace customdata.
+    # Descriptions are escaped + newline->"<br>" once here, so JS can use innerHTML
+    # (no `white-space: pre-wrap` layout on every selection change).
+    # (blank CSV cells arrive as NaN: render them empty, not as "nan")
+    text = df["Text"].fillna("").astype(str)
+    desc = df["Description"].fillna("").astype(str)
+    events = df[["Year"]].assign(
+        Text=text,
+        desc_html=desc.map(html.escape).str.replace("\n", "<br>", regex=False)
+    )
+    events_js = events.to_json(orient="records")
+
+    # Short timelines: marker state for every possible selection, so a click is a
+    # lookup (no JS allocations). The tables are N x N, so from MARKER_TABLE_MAX_POINTS
+    # events on only the scalars are sent and JS builds the arrays per click.
+    cfg = {
+        "ACTIVE_COLOR": ACTIVE_COLOR,
+        "INACTIVE_COLOR": INACTIVE_COLOR,
+        "SELECTED_SIZE": SELECTED_SIZE,
+        "UNSELECTED_SIZE": UNSELECTED_SIZE,
+    }
+    if len(df) < MARKER_TABLE_MAX_POINTS:
+        styles = [marker_style(i, len(df)) for i in range(len(df))]
+        cfg["COLORS_BY_I"] = [c for c, _ in styles]
+        cfg["SIZES_BY_I"] = [z for _, z in styles]
+    cfg_js = json.dumps(cfg, separators=(",", ":")).replace("</", "<\\/")   # never close the <script> early
+
+    # Initial details are injected as raw HTML, so escape (text may contain & or <)
+    first_year = html.escape(str(df.at[0, "Year"]))
+    first_title = html.escape(text.at[0])
+    first_desc = events.at[0, "desc_html"]
+
+    out.write(minify_markup(f"""
 <!doctype html>
 <html>
 <head>
 <meta charset="utf-8"/>
 <meta name="viewport" content="width=device-width, initial-scale=1"/>
 <title>Echoes of Freedom in Iran</title>
+{PLOTLY_LOADER_JS}
 
 <style>
   :root {{
@@ -217,10 +456,6 @@ def build_html(fig: go.Figure, df: pd.DataFrame, icon_uri: str) -> str:
     --black: {ACTIVE_COLOR};
     --inactive: {INACTIVE_COLOR};
     --tick: {TICK_COLOR};
-
-    --glass-bg: rgba(255,255,255,0.30);
-    --glass-border: rgba(255,255,255,0.40);
-    --glass-blur: 6px;
   }}
 
   body {{
@@ -298,14 +533,6 @@ def build_html(fig: go.Figure, df: pd.DataFrame, icon_uri: str) -> str:
     width: min(1300px, 96vw);
     padding: clamp(18px, 2vw, 26px);
 
-    /* Tooltip-related "glass" was not requested here; keeping your panel as-is */
-    /*
-    border-radius: 16px;
-    background: var(--glass-bg);
-    border: 1px solid var(--glass-border);
-    backdrop-filter: blur(var(--glass-blur));
-    */
-
     height: fit-content;
     max-height: 38vh;
     overflow: auto;
@@ -331,33 +558,8 @@ def build_html(fig: go.Figure, df: pd.DataFrame, icon_uri: str) -> str:
     font-size: clamp(18px, 1.8vw, 24px);
     line-height: 1.65;
     color: var(--black);
-    white-space: pre-wrap;
   }}
 
-  /* =========================
-     TOOLTIP CSS (DISABLED) ✅
-     ========================= */
-  /*
-  .js-plotly-plot .plotly .hoverlayer .hovertext {{
-    filter: drop-shadow(0 8px 18px rgba(0,0,0,0.18));
-  }}
-  .js-plotly-plot .plotly .hoverlayer .hovertext path {{
-    fill: var(--glass-bg) !important;
-    stroke: var(--glass-border) !important;
-    stroke-width: 1px !important;
-  }}
-  .js-plotly-plot .plotly .hoverlayer .hovertext text {{
-    font-size: 20px !important;
-  }}
-  .js-plotly-plot .plotly .hoverlayer .hovertext tspan {{
-    font-size: 20px !important;
-    line-height: 1.35 !important;
-  }}
-  .js-plotly-plot .plotly .hoverlayer .hovertext .name {{
-    font-weight: 900 !important;
-  }}
-  */
-
   @media (max-width: 640px) {{
     #prevBtn {{ left: 0; }}
     #nextBtn {{ right: 0; }}
@@ -375,12 +577,27 @@ def build_html(fig: go.Figure, df: pd.DataFrame, icon_uri: str) -> str:
 
       <div class="title-row">
         <h1>Echoes of Freedom in Iran</h1>
-        {icon_html}
+        """).encode("utf-8"))
+
+    # Icon is streamed in place (no intermediate data-URI string); skipped if missing
+    if ICON_PATH.exists():
+        out.write(b'<img class="title-icon" src="')
+        write_data_uri(out, ICON_PATH, ICON_MIME)
+        out.write(b'" alt="icon" />')
+
+    out.write(minify_markup("""
       </div>
 
       <div class="timeline-wrap">
         <button class="navbtn" id="prevBtn">‹</button>
-        {plot_div}
+        """).encode("utf-8"))
+
+    out.write(defer_plotly(plot_div))
+
+    # Static markup is minified first, then the CSV-derived values are filled in
+    # (so they are never touched by the minifier). EVENTS/CFG are JSON only, so no
+    # value can break the interaction script that follows.
+    out.write(minify_markup("""
         <button class="navbtn" id="nextBtn">›</button>
       </div>
 
@@ -394,106 +611,50 @@ def build_html(fig: go.Figure, df: pd.DataFrame, icon_uri: str) -> str:
   </div>
 
 <script>
-(function() {{
-  const gd = document.getElementById("timeline");
-  const PAST = 0, FUTURE = 1, POINTS = 2;
-
-  let selectedIndex = 0;
-
-  function clamp(i) {{
-    const n = gd.data[POINTS].x.length;
-    return Math.max(0, Math.min(n - 1, i));
-  }}
-
-  function updateDetails(i) {{
-    const cd = gd.data[POINTS].customdata[i];
-    document.getElementById("metaYear").textContent = "Year: " + cd[0];
-    document.getElementById("detailTitle").textContent = cd[1];
-    document.getElementById("detailDesc").textContent = cd[2];
-  }}
-
-  function updateLines(i) {{
-    const xs = gd.data[POINTS].x;
-    const pastX = xs.slice(0, i + 1);
-    const futX  = xs.slice(i);
-
-    Plotly.restyle(gd, {{
-      x: [pastX],
-      y: [Array(pastX.length).fill(0)]
-    }}, [PAST]);
-
-    Plotly.restyle(gd, {{
-      x: [futX],
-      y: [Array(futX.length).fill(0)]
-    }}, [FUTURE]);
-  }}
-
-  function highlight(i) {{
-    const n = gd.data[POINTS].x.length;
-    const colors = Array(n).fill("{INACTIVE_COLOR}");
-    const sizes  = Array(n).fill({UNSELECTED_SIZE});
-    const opacities = Array(n).fill(1.0);
-
-    for (let k = 0; k <= i; k++) {{
-      colors[k] = "{ACTIVE_COLOR}";
-      sizes[k] = {UNSELECTED_SIZE};
-      opacities[k] = 1.0;
-    }}
-
-    colors[i] = "{ACTIVE_COLOR}";
-    sizes[i]  = {SELECTED_SIZE};
-    opacities[i] = 1.0;
-
-    Plotly.restyle(gd, {{
-      "marker.color": [colors],
-      "marker.size":  [sizes],
-      "marker.opacity": [opacities]
-    }}, [POINTS]);
-
-    updateLines(i);
-    updateDetails(i);
-    selectedIndex = i;
-  }}
-
-  gd.on("plotly_click", (e) => {{
-    if (!e || !e.points || !e.points.length) return;
-    const pt = e.points[0];
-    if (pt.curveNumber !== POINTS) return;
-    highlight(pt.pointIndex);
-  }});
-
-  document.getElementById("prevBtn").addEventListener("click", () => {{
-    highlight(clamp(selectedIndex - 1));
-  }});
-  document.getElementById("nextBtn").addEventListener("click", () => {{
-    highlight(clamp(selectedIndex + 1));
-  }});
-
-  setTimeout(() => highlight(0), 80);
-}})();
+const EVENTS = {events_js};
+const CFG = {cfg_js};
 </script>
-
-</body>
-</html>
-"""
+""").format(
+        first_year=first_year,
+        first_title=first_title,
+        first_desc=first_desc,
+        events_js=events_js,
+        cfg_js=cfg_js,
+    ).encode("utf-8"))
+    out.write(minify_markup(TIMELINE_JS).encode("utf-8"))
+    out.write(b"\n</body>\n</html>\n")
 
 
 # =========================
 # (G) MAIN ENTRY
 # =========================
 def main():
-    df = pd.read_csv(CSV_PATH)
-
-    required = {"Year", "Event", "Text", "Description"}
-    missing = required - set(df.columns)
-    if missing:
-        raise ValueError(f"CSV missing columns: {missing}. Found: {list(df.columns)}")
-
-    fig, df_sorted = build_figure(df)
-    icon_uri = file_to_data_uri(ICON_PATH, ICON_MIME)
-
-    html = build_html(fig, df_sorted, icon_uri)
-    OUTPUT_HTML.write_text(html, encoding="utf-8")
+    # pyarrow engine parses columns in parallel; only the needed columns are read
+    required = ["Year", "Event", "Text", "Description"]
+    try:
+        df = pd.read_csv(CSV_PATH, usecols=required, dtype={"Year": "int32"}, engine="pyarrow")
+    except KeyError as e:   # pyarrow raises ArrowKeyError (a KeyError) for a missing column
+        found = list(pd.read_csv(CSV_PATH, nrows=0).columns)
+        missing = [c for c in required if c not in found]
+        raise ValueError(f"CSV missing columns: {missing}. Found: {found}") from e
+    except ValueError as e:  # ArrowInvalid (a ValueError): blank or non-integer Year cell
+        raise ValueError(f"CSV has a blank or non-integer Year: {e}") from e
+
+    # Curated CSVs are usually in order already: compare each row with the previous
+    # one (vectorized, no factorizing) and only sort + copy when that fails.
+    # Year alone is not enough: ties on Year must also be ordered by Event.
+    # Comparisons (not np.diff) so a text Event column works too.
+    y, e = df["Year"], df["Event"]
+    in_order = ((y > y.shift()) | ((y == y.shift()) & (e >= e.shift())))[1:].all()
+    if not in_order:
+        df = df.sort_values(["Year", "Event"]).reset_index(drop=True)
+    plot_div = build_plot_div(df)
+
+    if PLOTLY_JS_MODE == "directory":
+        ensure_plotly_bundle(OUTPUT_HTML.parent / "plotly.min.js")
+
+    with OUTPUT_HTML.open("wb") as out:
+        build_html(out, plot_div, df)
     print("✅ index.html generated")
 
 